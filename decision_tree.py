@@ -1,9 +1,33 @@
 # edit this for later!
 from __future__ import annotations
 
-import csv
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Optional
 
+import csv
+import sys
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Sentinel stored in FrozenTree.root_ints for roots with no integer form.
+_NO_INT = np.iinfo(np.int64).min
+
+# Preformatted indentation strings, grown on demand, so Tree.__str__ reuses
+# one string per depth instead of multiplying '  ' * depth for every node.
+_INDENTS = ['', '  ', '    ', '      ', '        ']
+
 
 
 # @check_contracts - We are commenting this out, so it doesn't slow down the code for Part 1.2
@@ -29,6 +53,10 @@ class Tree:
     _root: Optional[Any]
     _subtrees: list[Tree]
 
+    # No per-instance __dict__: trees are allocated by the thousand, and
+    # slots shrink each node and speed up attribute access.
+    __slots__ = ('_root', '_subtrees', '_root_typed', '_value_set')
+
     def __init__(self, root: Optional[Any], subtrees: list[Tree]) -> None:
         """Initialize a new Tree with the given root value and subtrees.
 
@@ -39,31 +67,54 @@ class Tree:
         """
         self._root = root
         self._subtrees = subtrees
+        # Cache the typed form of the root once: the int value for roots
+        # parsed from answer columns, otherwise the root itself. traverse
+        # then compares int vs int instead of re-parsing the same string
+        # on every visit.
+        try:
+            self._root_typed = int(root)
+        except (TypeError, ValueError):
+            self._root_typed = root
+        # Lazily built set of every value in this tree, used to answer
+        # membership queries in O(1); None until the first query and reset
+        # to None on every mutation.
+        self._value_set = None
 
     def is_empty(self) -> bool:
         return self._root is None
 
     def __len__(self) -> int:
-
-        if self.is_empty():
-            return 0
-        else:
-            size = 1  # count the root
-            for subtree in self._subtrees:
-                size += subtree.__len__()  # could also write len(subtree)
-            return size
+        # Explicit stack instead of recursion: no per-node call frame and
+        # no recursion-limit risk on deep skewed trees.
+        size = 0
+        stack = [self]
+        # Bound methods hoisted out of the loop: one LOAD_FAST per node
+        # instead of an attribute lookup and method bind.
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            tree = pop()
+            if tree._root is not None:
+                size += 1
+                extend(tree._subtrees)
+        return size
 
     def __contains__(self, item: Any) -> bool:
-
-        if self.is_empty():
-            return False
-        elif self._root == item:
-            return True
-        else:
-            for subtree in self._subtrees:
-                if subtree.__contains__(item):
-                    return True
-            return False
+        # Amortized: the full walk happens once, then every membership
+        # query until the next mutation is a set lookup.
+        if self._value_set is None:
+            values = set()
+            add = values.add
+            stack = [self]
+            pop = stack.pop
+            extend = stack.extend
+            while stack:
+                tree = pop()
+                if tree._root is not None:
+                    add(tree._root)
+                    extend(tree._subtrees)
+            self._value_set = values
+        return item in self._value_set
 
     def __str__(self) -> str:
         """Return a string representation of this tree.
@@ -72,23 +123,29 @@ class Tree:
         descendants' items. The output is nicely indented.
 
         You may find this method helpful for debugging.
-        """
-        return self._str_indented(0).rstrip()
-
-    def _str_indented(self, depth: int) -> str:
-        """Return an indented string representation of this tree.
 
-        The indentation level is specified by the <depth> parameter.
+        Fragments are gathered into a list and joined once, so building the
+        string is linear in the tree size rather than quadratic.
         """
-        if self.is_empty():
-            return ''
-        else:
-            str_so_far = '  ' * depth + f'{self._root}\n'
-            for subtree in self._subtrees:
-                # Note that the 'depth' argument to the recursive call is
-                # modified.
-                str_so_far += subtree._str_indented(depth + 1)
-            return str_so_far
+        parts = []
+        stack = [(self, 0)]
+        parts_append = parts.append
+        stack_pop = stack.pop
+        stack_append = stack.append
+        indents = _INDENTS
+        while stack:
+            tree, depth = stack_pop()
+            if tree._root is None:
+                continue
+            if depth >= len(indents):
+                # Depth only ever grows by one, so extending by one suffices.
+                indents.append(indents[-1] + '  ')
+            parts_append(indents[depth])
+            parts_append(f'{tree._root}\n')
+            # Reversed so the stack pops subtrees in left-to-right order.
+            for subtree in reversed(tree._subtrees):
+                stack_append((subtree, depth + 1))
+        return ''.join(parts).rstrip()
 
     def remove(self, item: Any) -> bool:
         """Delete *one* occurrence of the given item from this tree.
@@ -98,29 +155,33 @@ class Tree:
         """
         if self.is_empty():
             return False
-        elif self._root == item:
+        self._value_set = None
+        if self._root == item:
             self._delete_root()  # delete the root
             return True
-        else:
-            for subtree in self._subtrees:
-                deleted = subtree.remove(item)
-                if deleted and subtree.is_empty():
-                    # The item was deleted and the subtree is now empty.
-                    # We should remove the subtree from the list of subtrees.
-                    # Note that mutate a list while looping through it is
-                    # EXTREMELY DANGEROUS!
-                    # We are only doing it because we return immediately
-                    # afterward, and so no more loop iterations occur.
-                    self._subtrees.remove(subtree)
-                    return True
-                elif deleted:
-                    # The item was deleted, and the subtree is not empty.
+        stack = [self]
+        while stack:
+            parent = stack.pop()
+            # Every ancestor of the removed node passes through here before
+            # the node is found, so its membership memo goes stale too.
+            parent._value_set = None
+            subtrees = parent._subtrees
+            # Iterate by index from the back: we already know where the
+            # subtree lives, so an emptied one is deleted with an O(1)
+            # swap-pop instead of list.remove's O(k) identity scan.
+            for i in range(len(subtrees) - 1, -1, -1):
+                subtree = subtrees[i]
+                if subtree._root == item:
+                    subtree._delete_root()
+                    if subtree.is_empty():
+                        # The subtree is now empty, so it must be removed
+                        # from its parent to keep the representation
+                        # invariants. Subtree order is not significant.
+                        subtrees[i] = subtrees[-1]
+                        subtrees.pop()
                     return True
-
-            # If the loop doesn't return early, the item was not deleted from
-            # any of the subtrees. In this case, the item does not appear
-            # in this tree.
-            return False
+                stack.append(subtree)
+        return False
 
     def _delete_root(self) -> None:
         """Remove the root item of this tree.
@@ -128,14 +189,21 @@ class Tree:
         Preconditions:
             - not self.is_empty()
         """
+        # Every removal goes through here, so this is the one place the
+        # memoized traversal results must be invalidated.
+        Tree._traverse_cached.cache_clear()
+        self._value_set = None
+        # _root_typed mirrors _root, so it must follow every reassignment.
         if not self._subtrees:
             self._root = None
+            self._root_typed = None
         else:
             # Strategy: Promote a subtree (the rightmost one is chosen here).
             # Get the last subtree in this tree.
             last_subtree = self._subtrees.pop()
 
             self._root = last_subtree._root
+            self._root_typed = last_subtree._root_typed
             self._subtrees.extend(last_subtree._subtrees)
 
 
@@ -143,18 +211,210 @@ class Tree:
     def traverse(self, answers: list[bool]) -> list[str]:
         """
         Traverses the tree to return values of leaves based on the given answers.
+
+        The tree is immutable between mutating calls, so results are memoized
+        by the answers tuple; repeated queries in an interactive session
+        return straight from the cache.
         """
-        if len(answers) == 0:
-            ans = []
-            for i in self._subtrees:
-                ans.append(i._root)
-            return ans
+        return list(self._traverse_cached(tuple(answers)))
 
+    @lru_cache(maxsize=1024)
+    def _traverse_cached(self, answers: tuple[bool, ...]) -> tuple[str, ...]:
+        """Return the leaf values reached by answers, as a cacheable tuple.
+
+        Iterative with an explicit stack: answers is indexed by depth rather
+        than sliced per call, avoiding the O(depth) list copy and the Python
+        call frame at every node.
+        """
         match = []
+        stack = [(self, 0)]
+        n = len(answers)
+        match_extend = match.extend
+        stack_pop = stack.pop
+        stack_append = stack.append
+        while stack:
+            node, depth = stack_pop()
+            if depth == n:
+                match_extend(subtree._root for subtree in node._subtrees)
+                continue
+            target = answers[depth]
+            # Reversed so the stack pops subtrees in left-to-right order.
+            for subtree in reversed(node._subtrees):
+                if subtree._root_typed == target:
+                    stack_append((subtree, depth + 1))
+        return tuple(match)
+
+
+    def insert_sequence(self, items: list) -> None:
+        """Insert the given sequence of items into this tree.
+
+        Each item is inserted as a child of the previous item in the
+        sequence, reusing an existing subtree when the item already
+        appears at that level.
 
-        for subtree in self._subtrees:
-            if int(subtree._root) == answers[0]:
-                match.extend(subtree.traverse(answers[1:]))
+        Preconditions:
+            - not self.is_empty() or self._root == ''
+        """
+        Tree._traverse_cached.cache_clear()
+        tree = self
+        for item in items:
+            # Anything inserted lands below every tree on this path, so
+            # each one's membership memo goes stale as the walk passes it.
+            tree._value_set = None
+            for subtree in tree._subtrees:
+                if subtree._root == item:
+                    tree = subtree
+                    break
+            else:
+                new_tree = Tree(item, [])
+                tree._subtrees.append(new_tree)
+                tree = new_tree
+
+    def freeze(self) -> FrozenTree:
+        """Return an immutable, flattened copy of this tree.
+
+        A single breadth-first pass numbers the nodes 0..N-1 and packs them
+        into compressed-sparse-row arrays, so the children of node i are the
+        contiguous slice child_idx[child_start[i]:child_start[i + 1]].
+        """
+        order = []
+        queue = deque([self])
+        while queue:
+            tree = queue.popleft()
+            order.append(tree)
+            queue.extend(tree._subtrees)
+
+        n = len(order)
+        index = {id(tree): i for i, tree in enumerate(order)}
+        child_start = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum([len(tree._subtrees) for tree in order], out=child_start[1:])
+        child_idx = np.empty(child_start[-1], dtype=np.int32)
+        pos = 0
+        for tree in order:
+            for subtree in tree._subtrees:
+                child_idx[pos] = index[id(subtree)]
+                pos += 1
+
+        roots = np.empty(n, dtype=object)
+        root_ints = np.empty(n, dtype=np.int64)
+        for i, tree in enumerate(order):
+            roots[i] = tree._root
+            root_ints[i] = (tree._root_typed
+                            if isinstance(tree._root_typed, int) else _NO_INT)
+        return FrozenTree(roots, root_ints, child_start, child_idx)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _traverse_frozen(child_start: np.ndarray, child_idx: np.ndarray,
+                         root_ints: np.ndarray, answers: np.ndarray,
+                         leaf_out: np.ndarray) -> int:
+        """Fill leaf_out with the node ids reached by answers; return the count.
+
+        Pure integer loop over the CSR arrays, compiled by Numba. Every node
+        is pushed at most once, so stacks sized to the node count suffice.
+        """
+        n_nodes = len(child_start) - 1
+        stack = np.empty(n_nodes + 1, np.int32)
+        depths = np.empty(n_nodes + 1, np.int32)
+        stack[0] = 0
+        depths[0] = 0
+        sp = 1
+        n = len(answers)
+        k = 0
+        while sp:
+            sp -= 1
+            node = stack[sp]
+            depth = depths[sp]
+            lo, hi = child_start[node], child_start[node + 1]
+            if depth == n:
+                for c in range(lo, hi):
+                    leaf_out[k] = child_idx[c]
+                    k += 1
+            else:
+                target = answers[depth]
+                # Reversed so the stack pops children in left-to-right order.
+                for c in range(hi - 1, lo - 1, -1):
+                    child = child_idx[c]
+                    if root_ints[child] == target:
+                        stack[sp] = child
+                        depths[sp] = depth + 1
+                        sp += 1
+        return k
+else:
+    _traverse_frozen = None
+
+
+class FrozenTree:
+    """An immutable tree flattened into compressed-sparse-row arrays.
+
+    Instead of one heap object per node, the whole tree lives in three
+    contiguous buffers, so subtree iteration is an array slice and
+    traversal never chases pointers. Built via Tree.freeze.
+
+    Representation Invariants:
+        - len(self.roots) == len(self.root_ints) == len(self.child_start) - 1
+        - len(self.child_idx) == self.child_start[-1]
+    """
+    # Private Instance Attributes:
+    #   - roots: The item stored at each node, in node-id order.
+    #   - root_ints: The integer form of each root (_NO_INT if none).
+    #   - child_start: child_start[i]:child_start[i+1] is the range of node
+    #       i's children within child_idx.
+    #   - child_idx: The node ids of all children, grouped by parent.
+    roots: np.ndarray
+    root_ints: np.ndarray
+    child_start: np.ndarray
+    child_idx: np.ndarray
+
+    def __init__(self, roots: np.ndarray, root_ints: np.ndarray,
+                 child_start: np.ndarray, child_idx: np.ndarray) -> None:
+        """Initialize a frozen tree from prebuilt CSR arrays."""
+        self.roots = roots
+        self.root_ints = root_ints
+        self.child_start = child_start
+        self.child_idx = child_idx
+        self._roots_set = set(roots) - {None}
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.roots != None))  # noqa: E711
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._roots_set
+
+    def traverse(self, answers: list[bool]) -> list[str]:
+        """
+        Traverses the tree to return values of leaves based on the given answers.
+
+        Same semantics as Tree.traverse, but each step scans a contiguous
+        child_idx slice instead of a Python list of subtree objects. When
+        Numba is available, the whole walk runs in the compiled
+        _traverse_frozen kernel and only the leaf titles are looked up here.
+        """
+        if _traverse_frozen is not None:
+            leaf_out = np.empty(len(self.roots), dtype=np.int32)
+            k = _traverse_frozen(self.child_start, self.child_idx, self.root_ints,
+                                 np.array(answers, dtype=np.int64), leaf_out)
+            return list(self.roots[leaf_out[:k]])
+
+        match = []
+        stack = [(0, 0)]
+        n = len(answers)
+        child_start = self.child_start
+        child_idx = self.child_idx
+        root_ints = self.root_ints
+        while stack:
+            node, depth = stack.pop()
+            children = child_idx[child_start[node]:child_start[node + 1]]
+            if depth == n:
+                match.extend(self.roots[children])
+                continue
+            # One branch-free vectorized compare over all children replaces
+            # a per-child if, which the CPU cannot predict on real data.
+            hits = children[root_ints[children] == answers[depth]]
+            # Reversed so the stack pops children in left-to-right order.
+            for child in hits[::-1]:
+                stack.append((child, depth + 1))
         return match
 
 
@@ -170,30 +430,124 @@ def process_movies(file: str) -> list:
     This function will process the file data, creat and return a list of movie dictionary objects which will them be
     used to filter for user's specific requests.
     """
-    tree = Tree('', [])  # The start of a decision tree
+    if pd is None:
+        return _process_movies_csv(file)
+
+    # The CSV never changes between runs, so the cleaned table is cached
+    # next to it as Parquet (columnar, compressed); reloading the cache
+    # skips the whole parse on every start after the first.
+    cache = Path(file).with_suffix('.parquet')
+    if cache.exists() and cache.stat().st_mtime >= Path(file).stat().st_mtime:
+        df = pd.read_parquet(cache)
+    else:
+        # pandas parses the CSV in C and coerces the numeric columns in one
+        # vectorized pass, instead of one dict + several float()/int() calls
+        # per row.
+        df = pd.read_csv(
+            file,
+            usecols=['Series_Title', 'Genre', 'IMDB_Rating', 'Runtime', 'Director',
+                     'Meta_score', 'Star1', 'Star2', 'Star3', 'Star4'],
+            dtype={'IMDB_Rating': 'float32', 'Meta_score': 'float32'},
+        )
+        df['IMDB_Rating'] = df['IMDB_Rating'].fillna(0)
+        df['Meta_score'] = df['Meta_score'].fillna(0)
+        df['Runtime'] = df['Runtime'].str.removesuffix(' min').fillna('0').astype('Int32')
+        try:
+            df.to_parquet(cache, compression='zstd')
+        except (ImportError, OSError):
+            # No Parquet engine installed or the directory is read-only;
+            # just skip the cache and re-parse next run.
+            pass
+    df['Genre'] = df['Genre'].str.split(', ')
+
     movies = []
-    with open(file, encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file)
-        next(reader)  # skip the header row
+    for row in df.itertuples(index=False):
+        movies.append({
+            "Title": row.Series_Title,
+            "Genre": row.Genre,
+            "IMDB_Rating": row.IMDB_Rating,
+            "Runtime": row.Runtime,
+            "Director": row.Director,
+            "Meta_score": row.Meta_score,
+            "Stars": [row.Star1, row.Star2, row.Star3, row.Star4]
+        })
+    return movies
 
-        for row in reader:
-            try:
-                movie = {
-                    "Title": row["Series_Title"],
-                    "Genre": row["Genre"].split(", "),  # Use first genre (for simplicity)
-                    "IMDB_Rating": float(row["IMDB_Rating"]) if row["IMDB_Rating"] else 0,
-                    "Runtime": int(row["Runtime"].replace(" min", "")) if row["Runtime"] else 0,
-                    "Director": row["Director"],
-                    "Meta_score": float(row["Meta_score"]) if row["Meta_score"] else 0,
-                    "Stars": [row["Star1"], row["Star2"], row["Star3"], row["Star4"]]  # Choose one main actor for feature
-                }
-                movies.append(movie)
-            except (Exception,):
-                continue
 
+def _process_movies_csv(file: str) -> list:
+    """Fallback for process_movies using only the csv module.
+
+    Uses csv.reader with fixed column offsets instead of csv.DictReader,
+    so no fieldname dict is allocated or re-mapped per row, and checks
+    for empty fields explicitly rather than catching all exceptions.
+    """
+    movies = []
+    with open(file, encoding="utf-8", newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        idx = {name: i for i, name in enumerate(header)}
+        title_i, genre_i, rating_i, runtime_i, director_i, meta_i, s1, s2, s3, s4 = (
+            idx[key] for key in ('Series_Title', 'Genre', 'IMDB_Rating', 'Runtime',
+                                 'Director', 'Meta_score', 'Star1', 'Star2', 'Star3', 'Star4'))
+        movies_append = movies.append
+        # Directors and genre names repeat across most rows; interning them
+        # makes every equal value share one string object, so comparisons
+        # are pointer checks and the duplicates cost no extra memory.
+        pool = {}
+        pooled = pool.setdefault
+        for row in reader:
+            movies_append({
+                "Title": row[title_i],
+                "Genre": [pooled(g, sys.intern(g)) for g in row[genre_i].split(", ")],
+                "IMDB_Rating": float(row[rating_i]) if row[rating_i] else 0,
+                "Runtime": int(row[runtime_i][:-4]) if row[runtime_i] else 0,
+                "Director": pooled(row[director_i], sys.intern(row[director_i])),
+                "Meta_score": float(row[meta_i]) if row[meta_i] else 0,
+                "Stars": [row[s1], row[s2], row[s3], row[s4]]
+            })
     return movies
 
 
+def build_decision_tree(file: str, feature_columns: list[str],
+                        label_column: str = 'Series_Title') -> Tree:
+    """Return a decision tree over the rows of the given CSV file.
+
+    Each level of the tree corresponds to one feature column, in order,
+    and the leaves hold the label column values.
+
+    The rows are grouped by the first feature, recursing per group on the
+    remaining ones, so every node is constructed exactly once; calling
+    insert_sequence per row would instead re-walk from the root and
+    re-compare O(depth) values for every single row.
+    """
+    if pd is None:
+        # Fallback without pandas: row-by-row insertion.
+        tree = Tree('', [])
+        with open(file, encoding="utf-8", newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader)
+            idx = [header.index(col) for col in feature_columns + [label_column]]
+            for row in reader:
+                tree.insert_sequence([row[i] for i in idx])
+        return tree
+
+    df = pd.read_csv(file, usecols=feature_columns + [label_column])
+    # groupby drops missing keys; represent them as '' like the csv path.
+    df[feature_columns] = df[feature_columns].fillna('')
+    return Tree('', _build_subtrees(df, feature_columns, label_column))
+
+
+def _build_subtrees(df: pd.DataFrame, feature_columns: list[str],
+                    label_column: str) -> list[Tree]:
+    """Return the subtrees for one level of build_decision_tree's grouping."""
+    if not feature_columns:
+        return [Tree(label, []) for label in df[label_column]]
+    rest = feature_columns[1:]
+    # groupby runs in C and hands back each block of equal keys at once.
+    return [Tree(key, _build_subtrees(group, rest, label_column))
+            for key, group in df.groupby(feature_columns[0], sort=False)]
+
+
 def get_exact(lst: list) -> list:
 
 
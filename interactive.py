@@ -1,49 +1,16 @@
 """The user interactive system for movie recommendations."""
 from __future__ import annotations
-import csv
-from typing import Dict, List, Any, Optional, Set, Tuple
-from dataclasses import dataclass
+import heapq
+import sys
+from itertools import islice
+from typing import Dict, Optional, Sequence, Set, Tuple, List
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
 import user_movie_graph
 
 
-class _Vertex:
-    """A vertex in a graph.
-
-    Instance Attributes:
-        - item: The data stored in this vertex.
-        - neighbours: The vertices that are adjacent to this vertex.
-
-    Representation Invariants:
-        - self not in self.neighbours
-        - all(self in u.neighbours for u in self.neighbours)
-    """
-    item: Any
-    neighbours: set[_Vertex]
-
-    def __init__(self, item: Any, neighbours: set[_Vertex]) -> None:
-        """Initialize a new vertex with the given item and neighbours."""
-        self.item = item
-        self.neighbours = neighbours
-
-
-class Graph:
-    """A graph.
-
-    Representation Invariants:
-        - all(item == self._vertices[item].item for item in self._vertices)
-    """
-    # Private Instance Attributes:
-    #     - _vertices:
-    #         A collection of the vertices contained in this graph.
-    #         Maps item to _Vertex object.
-    _vertices: dict[Any, _Vertex]
-
-    def __init__(self) -> None:
-        """Initialize an empty graph (no vertices or edges)."""
-        self._vertices = {}
-
-
-@dataclass
+@dataclass(slots=True)
 class Movie:
     """Represents a Movie in the movie recommendation system.
 
@@ -56,7 +23,7 @@ class Movie:
       - rating: IMDb user rating of the movie.
       - meta_score: The weighted average given to movies.
       - director: The movie director's full name.
-      - lead_actors: A list of the main actors' names.
+      - lead_actors: A sequence of the main actors' names.
       - votes: The number of votes that the movie got.
       - gross: The gross revenue of the movie.
     """
@@ -66,26 +33,16 @@ class Movie:
     genre: str
     rating: float
     director: str
-    lead_actors: List[str]
+    # Excluded from __eq__: the value is a NumPy row view, and comparing
+    # arrays inside the generated tuple equality raises ValueError.
+    lead_actors: Sequence[str] = field(compare=False)
     votes: int
 
-    def __init__(self, title: str, year: int, length: int, genre: str, rating: float,
-                 director: str, lead_actors: List[str], votes: int) -> None:
-        """Initialize a movie object."""
-        self.title = title
-        self.year = year
-        self.length = length
-        self.genre = genre
-        self.rating = rating
-        self.director = director
-        self.lead_actors = lead_actors
-        self.votes = votes
-
     def __hash__(self) -> int:
         return hash((self.title, self.year))
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Represents a user with their preferences.
 
@@ -96,10 +53,111 @@ class User:
     user_id: int
     watched_movies: Set[Movie]
 
-    def __init__(self, user_id, watched_movies: Set[Movie]) -> None:
-        """Initialize a user object."""
-        self.user_id = user_id
-        self.watched_movies = watched_movies if watched_movies else set()
+
+class MovieTable:
+    """A column-oriented (struct-of-arrays) view of the movie catalog.
+
+    Each movie attribute is stored as one NumPy array, so filters like
+    'rating >= 8.0' scan a contiguous buffer once instead of dereferencing
+    one Movie object per row.
+
+    Instance Attributes:
+      - titles: The movie titles, in catalog order.
+      - years: The release year of each movie.
+      - length: The length of each movie in minutes.
+      - rating: IMDb user rating of each movie.
+      - meta_score: The weighted average score of each movie.
+      - votes: The number of votes each movie got.
+      - gross: The gross revenue of each movie (0 if unknown).
+      - genre_codes: Integer genre code of each movie (index into genres).
+      - genres: The unique genre strings, indexed by genre_codes.
+      - director_codes: Integer director code of each movie (index into directors).
+      - directors: The unique director names, indexed by director_codes.
+      - lead_actors: An (n_movies, 4) array of the main actors' names.
+
+    Representation Invariants:
+        - all arrays have the same length
+    """
+    titles: np.ndarray
+    years: np.ndarray
+    length: np.ndarray
+    rating: np.ndarray
+    meta_score: np.ndarray
+    votes: np.ndarray
+    gross: np.ndarray
+    genre_codes: np.ndarray
+    genres: np.ndarray
+    director_codes: np.ndarray
+    directors: np.ndarray
+    lead_actors: np.ndarray
+
+    def __init__(self, titles: np.ndarray, years: np.ndarray, length: np.ndarray,
+                 rating: np.ndarray, meta_score: np.ndarray, votes: np.ndarray,
+                 gross: np.ndarray, genre_codes: np.ndarray, genres: np.ndarray,
+                 director_codes: np.ndarray, directors: np.ndarray,
+                 lead_actors: np.ndarray) -> None:
+        """Initialize a movie table with the given column arrays."""
+        self.titles = titles
+        self.years = years
+        self.length = length
+        self.rating = rating
+        self.meta_score = meta_score
+        self.votes = votes
+        self.gross = gross
+        self.genre_codes = genre_codes
+        self.genres = genres
+        self.director_codes = director_codes
+        self.directors = directors
+        self.lead_actors = lead_actors
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> MovieTable:
+        """Return a movie table built from a cleaned movies dataframe.
+
+        Preconditions:
+            - numeric columns of df have already been coerced to numbers
+        """
+        # Categoricals store one small int per row plus the unique strings,
+        # so repeated genres/directors cost no extra memory and filters on
+        # them compare ints rather than strings.
+        genre_cat = pd.Categorical(df['Genre'])
+        director_cat = pd.Categorical(df['Director'])
+        gross = (df['Gross'].str.replace(',', '', regex=False)
+                 .fillna('0').astype('int64'))
+        return cls(
+            titles=df['Series_Title'].to_numpy(dtype=object),
+            years=df['Released_Year'].to_numpy(dtype=np.int16),
+            length=df['Runtime'].to_numpy(dtype=np.int16),
+            rating=df['IMDB_Rating'].to_numpy(dtype=np.float32),
+            meta_score=df['Meta_score'].fillna(0).to_numpy(dtype=np.float32),
+            votes=df['No_of_Votes'].to_numpy(dtype=np.int32),
+            gross=gross.to_numpy(dtype=np.int64),
+            genre_codes=np.asarray(genre_cat.codes),
+            genres=genre_cat.categories.to_numpy(dtype=object),
+            director_codes=np.asarray(director_cat.codes),
+            directors=director_cat.categories.to_numpy(dtype=object),
+            # One contiguous (n, 4) buffer: actor queries become a single
+            # vectorized compare (np.any(lead_actors == name, axis=1))
+            # instead of scanning n small Python lists.
+            lead_actors=df[['Star1', 'Star2', 'Star3', 'Star4']].to_numpy(dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def get_exact(self, min_rating: float = 0.0, max_length: int = 10 ** 4,
+                  genre: Optional[str] = None) -> np.ndarray:
+        """Return the indices of all movies matching the given filters.
+
+        The filters are combined as one vectorized boolean mask over the
+        column arrays, so this is a single scan of contiguous memory.
+        """
+        mask = (self.rating >= min_rating) & (self.length <= max_length)
+        if genre is not None:
+            matches = np.nonzero(self.genres == genre)[0]
+            code = matches[0] if len(matches) > 0 else -1
+            mask &= self.genre_codes == code
+        return np.where(mask)[0]
 
 
 class MovieRecommender:
@@ -109,18 +167,35 @@ class MovieRecommender:
       - movies: A dictionary mapping movie titles to movie objects.
       - users: A dictionary mapping user_ids to user objects.
       - current_user: The currently active user (None if no user logged in).
+      - table: The column-oriented movie catalog (None before load_data).
+      - title_to_idx: A dictionary mapping movie titles to their row in table.
+      - ratings: The sparse user-movie ratings matrix with its id/index
+          mappings (None before load_data).
+      - top_movies_by_rating: The ten highest-rated movies in the catalog,
+          used as cold-start recommendations for users with no history.
     """
     movies: Dict[str, Movie]
     users: Dict[int, User]
     current_user: Optional[User]
-    graph: Optional[Graph]
+    table: Optional[MovieTable]
+    title_to_idx: Dict[str, int]
+    ratings: Optional[user_movie_graph.RatingsMatrix]
+    top_movies_by_rating: List[Movie]
 
     def __init__(self, movies: Dict[str, Movie], users: Dict[int, User], current_user: Optional[User]) -> None:
         """Initalize the movie recommender system with existing data."""
         self.movies = movies
         self.users = users
         self.current_user = current_user
-        self.graph = None
+        self.table = None
+        self.title_to_idx = {}
+        self.ratings = None
+        self.top_movies_by_rating = []
+        # Cache of find_similar_users results per user id, so repeated menu
+        # actions don't recompute similarities against an unchanged matrix.
+        # Each entry is [watched_key, result, prev_access, last_access].
+        self._sim_cache = {}
+        self._sim_clock = 0
 
     def load_data(self, movies_file: str, ratings_file: str) -> None:
         """Load movie and rating datas from csv files.
@@ -128,49 +203,131 @@ class MovieRecommender:
         Raise FileNotFound Error if either input file don't exist and ValueError if csv data is malformed.
         """
         try:
-            with open(movies_file, 'r', encoding="utf-8") as f:
-                reader = csv.reader(f)
-                _ = next(reader)
-                for row in reader:
-                    if len(row) != 16:
-                        raise ValueError(f"Expected 16 columns in movies.csv, got{len(row)}")
-                    _, title, year, _, length, genre, rating, _, _, director, actor1, actor2, \
-                        actor3, actor4, votes, _ = row
-                    if not year.strip().isdigit():
-                        print(f"Skipping invalid row (year='{row[2]}'): {row[1]}")
-                        continue
-                    else:
-                        self.movies[title] = Movie(
-                            title=title,
-                            year=int(year) if isinstance(year, int) else 0,
-                            length=int(str(length).replace("min", "")),
-                            genre=genre,
-                            rating=float(rating),
-                            director=director,
-                            lead_actors=[str(actor1), str(actor2), str(actor3), str(actor4)],
-                            votes=int(votes)
-                        )
-            ratings = []
-            with open(ratings_file, 'r', encoding="utf-8") as f:
-                reader = csv.reader(f)
-                _ = next(reader)
-                for row in reader:
-                    if len(row) != 4:
-                        raise ValueError(f"Expected 4 columns in ratings.csv, got{len(row)}")
-                    user_id, movie_title, rating, genre = int(row[0]), str(row[1]), float(row[2]), row[3].split(', ')[0]
-                    ratings.append((user_id, movie_title, rating, genre))
-                    if user_id not in self.users:
-                        self.users[user_id] = User(user_id, set())
-                    if movie_title in self.movies:
-                        self.users[user_id].watched_movies.add(self.movies[movie_title])
-
-            self.graph = user_movie_graph.build_user_movie_graph(ratings)
+            # pandas parses both files in C with vectorized type coercion,
+            # instead of per-row float()/int() calls through csv.reader.
+            movies_df = pd.read_csv(
+                movies_file,
+                usecols=['Series_Title', 'Released_Year', 'Runtime', 'Genre', 'IMDB_Rating',
+                         'Meta_score', 'Director', 'Star1', 'Star2', 'Star3', 'Star4',
+                         'No_of_Votes', 'Gross'],
+                dtype={'IMDB_Rating': 'float32', 'Meta_score': 'float32', 'No_of_Votes': 'int32'},
+            )
+            valid_year = movies_df['Released_Year'].str.strip().str.isdigit()
+            for row in movies_df[~valid_year].itertuples(index=False):
+                print(f"Skipping invalid row (year='{row.Released_Year}'): {row.Series_Title}")
+            movies_df = movies_df[valid_year]
+            movies_df['Released_Year'] = movies_df['Released_Year'].astype('int32')
+            movies_df['Runtime'] = movies_df['Runtime'].str.replace('min', '').astype('int32')
+
+            self.table = MovieTable.from_dataframe(movies_df)
+            self.title_to_idx = {title: i for i, title in enumerate(self.table.titles)}
+
+            # Genre and director values repeat across most rows: interning
+            # them makes equal values share one string object, so genre
+            # comparisons in get_recommendations are pointer checks.
+            for i, row in enumerate(movies_df.itertuples(index=False)):
+                self.movies[row.Series_Title] = Movie(
+                    title=row.Series_Title,
+                    year=row.Released_Year,
+                    length=row.Runtime,
+                    genre=sys.intern(row.Genre),
+                    rating=row.IMDB_Rating,
+                    director=sys.intern(row.Director),
+                    # A view into the table's (n, 4) actor array, rather
+                    # than allocating a fresh 4-element list per movie.
+                    lead_actors=self.table.lead_actors[i],
+                    votes=row.No_of_Votes
+                )
+
+            # Cold-start recommendations never change after load, so the
+            # top of the catalog is ranked once here.
+            self.top_movies_by_rating = heapq.nlargest(
+                10, self.movies.values(), key=lambda m: m.rating)
+
+            # Stream the ratings file in fixed-size chunks into pre-sized
+            # arrays: the row count is taken first, so the numeric columns
+            # are allocated once instead of growing Python lists row by row.
+            # This keeps peak memory flat even for very large rating files.
+            with open(ratings_file, encoding="utf-8") as f:
+                n_ratings = sum(1 for _ in f) - 1
+            user_arr = np.empty(n_ratings, dtype=np.int32)
+            rating_arr = np.empty(n_ratings, dtype=np.float32)
+            title_parts = []
+            genre_parts = []
+            offset = 0
+            for chunk in pd.read_csv(ratings_file, chunksize=1 << 20,
+                                     dtype={'User_ID': 'int32', 'Rating': 'float32'}):
+                k = len(chunk)
+                user_arr[offset:offset + k] = chunk['User_ID'].to_numpy()
+                rating_arr[offset:offset + k] = chunk['Rating'].to_numpy()
+                title_parts.append(chunk['Movie_Title'])
+                genre_parts.append(chunk['Genre'].str.split(', ').str[0])
+                offset += k
+            # The line count above over-estimates when quoted fields contain
+            # newlines (one record, several lines), so trim to the records
+            # actually parsed before anything reads the arrays.
+            user_arr = user_arr[:offset]
+            rating_arr = rating_arr[:offset]
+            titles = pd.concat(title_parts, ignore_index=True) if title_parts \
+                else pd.Series([], dtype=object)
+            genres = pd.concat(genre_parts, ignore_index=True) if genre_parts \
+                else pd.Series([], dtype=object)
+            ratings = list(zip(user_arr.tolist(), titles, rating_arr.tolist(), genres))
+
+            for user_id in np.unique(user_arr):
+                if int(user_id) not in self.users:
+                    self.users[int(user_id)] = User(int(user_id), set())
+            # One C-level groupby builds each user's watched set, instead of
+            # a dict lookup plus set.add per rating row.
+            matched = titles.map(self.movies).dropna()
+            watched = matched.groupby(user_arr[matched.index.to_numpy()]).apply(set)
+            for user_id, movies_seen in watched.items():
+                self.users[int(user_id)].watched_movies.update(movies_seen)
+
+            # Collaborative-filtering queries (shared movies, similar users)
+            # run against the sparse ratings matrix instead of per-user
+            # Python sets: one BLAS-backed matmul replaces N set intersections.
+            self.ratings = user_movie_graph.build_ratings_matrix(ratings)
+            # Maps each ratings-matrix column to its table row (-1 when the
+            # rated title is not in the catalog), so scoring can stay in
+            # integer index space end to end.
+            self._col_to_row = np.array(
+                [self.title_to_idx.get(t, -1) for t in self.ratings.movie_ids],
+                dtype=np.int32)
 
         except ValueError as val_err:
             print(f"Input error: {val_err}")
         except RuntimeError as rt_err:
             print(f"Runtime error: {rt_err}")
 
+    # Upper bound on cached similarity results; small, since each entry is
+    # only a top-N list, but enough for every user in a typical session.
+    _SIM_CACHE_SIZE = 64
+
+    def _similar_users_cached(self, current_user: User) -> List[Tuple[int, float]]:
+        """Return find_similar_users for the given user, cached between calls.
+
+        The ratings matrix never changes during a session, so the result is
+        reused until the user's watched set changes (tracked by its hash,
+        and dropped explicitly when a watched movie is added). Eviction is
+        LRU-2: the entry whose *second*-most-recent access is oldest goes
+        first, so users queried repeatedly survive one-off lookups.
+        """
+        watched_key = hash(frozenset(current_user.watched_movies))
+        self._sim_clock += 1
+        entry = self._sim_cache.get(current_user.user_id)
+        if entry is not None and entry[0] == watched_key:
+            entry[2] = entry[3]
+            entry[3] = self._sim_clock
+            return entry[1]
+
+        result = user_movie_graph.find_similar_users(self.ratings, current_user.user_id)
+        self._sim_cache[current_user.user_id] = [watched_key, result, 0, self._sim_clock]
+        if len(self._sim_cache) > self._SIM_CACHE_SIZE:
+            evict = min(self._sim_cache, key=lambda uid: self._sim_cache[uid][2])
+            del self._sim_cache[evict]
+        return result
+
     def get_recommendations(self, current_user: Optional[User]) -> List[Tuple[Movie, float]]:
         """Return a list of tuples with personalized movie recommendations matched to their matching scores and sorted
         by descending order.
@@ -182,23 +339,60 @@ class MovieRecommender:
         if not hasattr(current_user, 'user_id') or not hasattr(current_user, 'watched_movies'):
             raise ValueError("Invalid user object provided")
 
-        current_id = current_user.user_id
-        similar_users = user_movie_graph.find_similar_users(self.graph, str(current_id))
-        movie_scores = {}
-
+        # Cold start: with nothing watched there are no similar users and
+        # the genre bonus is uniform, so the ranking reduces to rating
+        # order -- serve the precomputed top of the catalog directly.
+        if not current_user.watched_movies:
+            return [(movie, float(movie.rating)) for movie in self.top_movies_by_rating]
+
+        similar_users = self._similar_users_cached(current_user)
+        table = self.table
+
+        # Collaborative part: everything stays in integer index space. Each
+        # similar user's rated movies are CSR column slices mapped to table
+        # rows, and one np.bincount accumulates the similarity-weighted
+        # ratings -- no Movie hashing or dict updates in the inner loop.
+        matrix = self.ratings.matrix
+        cf_rows = []
+        cf_weights = []
         for similar_user_id, similarity in similar_users:
-            similar_users_id_int = int(similar_user_id)
-            for movie in self.users[similar_users_id_int].watched_movies:
-                if movie not in self.current_user.watched_movies:
-                    movie_scores[movie] = movie_scores.get(movie, 0) + similarity * movie.rating
-
+            i = self.ratings.user_index[similar_user_id]
+            rows = self._col_to_row[matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]]]
+            rows = rows[rows >= 0]
+            cf_rows.append(rows)
+            cf_weights.append(np.full(len(rows), similarity, dtype=np.float32))
+
+        # Content-based part: the genre bonus for every movie comes from one
+        # vectorized pass over the table columns (match the unique genres,
+        # then gather per movie) instead of a Python loop over the catalog.
         user_genres = {m.genre for m in self.current_user.watched_movies}
-        for movie in self.movies.values():
-            if movie not in self.current_user.watched_movies:
-                genre_bonus = 1.0 if movie.genre in user_genres else 0.3
-                movie_scores[movie] = movie_scores.get(movie, 0) + movie.rating * genre_bonus
-
-        return sorted(movie_scores.items(), key=lambda x: x[1], reverse=True)[:10]
+        genre_match = np.isin(table.genres, list(user_genres))[table.genre_codes]
+        scores = np.where(genre_match, 1.0, 0.3).astype(np.float32) * table.rating
+        if cf_rows:
+            rows = np.concatenate(cf_rows)
+            weights = np.concatenate(cf_weights)
+            scores += np.bincount(rows, weights=weights * table.rating[rows],
+                                  minlength=len(table)).astype(np.float32)
+        watched_idx = [self.title_to_idx[m.title] for m in self.current_user.watched_movies
+                       if m.title in self.title_to_idx]
+        scores[watched_idx] = -np.inf
+
+        # A few extra candidates cover duplicate catalog titles, then the
+        # top 10 unique movies are collected in score order.
+        count = min(20, len(scores))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = sorted(top, key=lambda i: -scores[i])
+        recommendations = []
+        seen = set()
+        for i in top:
+            title = table.titles[i]
+            if title in seen or scores[i] == -np.inf:
+                continue
+            seen.add(title)
+            recommendations.append((self.movies[title], float(scores[i])))
+            if len(recommendations) == 10:
+                break
+        return recommendations
 
     def interactive_session(self) -> None:
         """Run an interactive recommendation session
@@ -252,10 +446,11 @@ class MovieRecommender:
                 title = input("Enter movie title you've watched: ").strip()
                 if title in self.movies:
                     self.current_user.watched_movies.add(self.movies[title])
+                    self._sim_cache.pop(self.current_user.user_id, None)
                     print(f"Added {title} to your watched list!")
                 else:
                     print("Movie not found. Available movies:")
-                    for movie in list(self.movies.values())[:3]:
+                    for movie in islice(self.movies.values(), 3):
                         print(f"- {movie.title}")
                     print("... (truncated)")
 